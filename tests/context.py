@@ -3,5 +3,4 @@ import sys
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-import lifting_tracker
-
+import tracker as lifting_tracker
@@ -1 +1,3 @@
-import tracker.core, tracker.helpers
+import tracker.core, tracker.helpers, tracker.analytics
+import tracker.database, tracker.cache, tracker.queries, tracker.export
+import tracker.loadtest, tracker.precompute, tracker.restore
@@ -0,0 +1,88 @@
+"""Calculate training volume, tonnage, and intensity for lifts grouped by user/exercise/period"""
+
+import pandas as pd
+import numpy as np
+
+
+def get_volume(df: pd.DataFrame, frequency="W", by="exercise") -> pd.DataFrame:
+    """
+    Get training volume for every user and exercise (or category) within a specific time interval
+
+    Returns one row per (user_id, exercise/category, date) with the number of sets, total reps,
+    tonnage (weight x reps), average intensity (% of e1RM), and the best 1RM of the interval
+    """
+    # https://pandas.pydata.org/pandas-docs/stable/user_guide/timeseries.html#offset-aliases
+    # W (weekly), M (monthly), SM (semi-monthly)
+    lifts = pd.DataFrame(
+        {
+            "date": pd.to_datetime(df["date"]),
+            "exercise": df["exercise"].to_numpy(),
+            by: df[by].to_numpy(),
+            "weight": df["weight"].to_numpy(dtype="float64"),
+            "reps": df["reps"].to_numpy(dtype="float64"),
+            "orm": df["orm"].to_numpy(dtype="float64"),
+        }
+    )
+
+    # lifts without a user (e.g. loaded from .csv) are grouped under user 0
+    if "user_id" in df:
+        lifts["user_id"] = df["user_id"].fillna(0).to_numpy(dtype="int64")
+    else:
+        lifts["user_id"] = 0
+
+    # sets without a weight or reps (e.g. cardio) have no volume
+    lifts = lifts[lifts["weight"].notna() & lifts["reps"].notna()]
+    lifts["reps"] = lifts["reps"].astype("int64")
+    lifts["tonnage"] = lifts["weight"] * lifts["reps"]
+
+    # intensity relative to the best 1RM achieved on that exercise up to the date of the set
+    lifts = lifts.sort_values("date", kind="mergesort")
+    best = lifts.groupby(["user_id", "exercise"], sort=False)["orm"].cummax()
+    lifts["intensity"] = 100 * lifts["weight"] / best.replace(0, np.nan)
+
+    volume = lifts.groupby(
+        ["user_id", by, pd.Grouper(key="date", freq=frequency)]
+    ).agg(
+        sets=("reps", "size"),
+        reps=("reps", "sum"),
+        tonnage=("tonnage", "sum"),
+        intensity=("intensity", "mean"),
+        orm=("orm", "max"),
+    )
+    volume.name = "Volume"
+    return volume
+
+
+def get_volume_series(
+    volume: pd.DataFrame, name: str, metric="tonnage", user_id=None
+) -> pd.DataFrame:
+    """
+    Get a single metric for one exercise/category from the DataFrame created by get_volume()
+
+    The result is indexed by date and named after the exercise/category so it can be passed to plot_lift_vs_time()
+    """
+    by = volume.index.names[1]
+    if name not in volume.index.get_level_values(by):
+        empty_index = pd.DatetimeIndex([], name="date")
+        series_df = pd.DataFrame(columns=[metric], index=empty_index)
+        series_df.name = name
+        return series_df
+
+    rows = volume.xs(name, level=by)
+    if user_id is not None:
+        rows = rows.xs(user_id, level="user_id")
+    else:
+        # combine all users: volume adds up, intensity is averaged, 1RM is the best of the interval
+        rows = rows.groupby(level="date").agg(
+            {
+                "sets": "sum",
+                "reps": "sum",
+                "tonnage": "sum",
+                "intensity": "mean",
+                "orm": "max",
+            }
+        )
+
+    series_df = rows[[metric]]
+    series_df.name = name
+    return series_df
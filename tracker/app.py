@@ -1,19 +1,30 @@
 """ Streamlit app with multiple views capable of CRUD and analysis of lifting data """
-import pandas as pd
 import streamlit as st
 from helpers import (  # pylint: disable-msg=E0611
-    calculate_1RM,
-    load_weight_csv,
-    load_lifts_csv,
-    load_lifts_sql,
-    get_maxes,
-    calculate_total,
-    calculate_wilks,
-    get_category,
-    add_exercise,
     plot_lift_vs_time,
+    ONE_RM_FORMULAS,
 )
-from database import add_data, start_db, Lift, User
+from database import start_db, get_user
+from queries import (
+    count_lifts,
+    get_lifts,
+    get_charts,
+    add_lift,
+    recalculate_user_orm,
+)
+from precompute import Precomputer
+
+DB_FILE = r"C:\Development\lifting-tracker\lift_tracker.db"
+
+
+@st.cache(allow_output_mutation=True)
+def start_precomputer(sql_db_file: str) -> Precomputer:
+    """
+    Background worker shared by every session, warms a user's cached data after they write
+    """
+    engine, session = start_db(sql_db_file)
+    session.close()
+    return Precomputer(engine)
 
 
 def main():
@@ -28,14 +39,28 @@ def main():
     # menu sidebar
     menu = ["Home", "Add Workout", "View Lifts", "View Progress"]
     choice = st.sidebar.selectbox("Menu", menu)
+    formula = st.sidebar.selectbox("1RM Formula", list(ONE_RM_FORMULAS))
+    username = st.sidebar.text_input("Username")
 
     # initialize SQL database
-    engine, session = start_db(r"C:\Development\lifting-tracker\lift_tracker.db")
+    engine, session = start_db(DB_FILE)
+    precomputer = start_precomputer(DB_FILE)
+
+    # every query below is scoped to the logged in user
+    if not username:
+        st.write("Enter a username to continue")
+        return
+    user_id = get_user(session, username).id
+
+    # rewrite stored 1RMs so they match the selected formula
+    if st.sidebar.button("Recalculate Stored 1RMs"):
+        updated = recalculate_user_orm(session, user_id, formula)
+        precomputer.schedule(user_id, formula)
+        st.sidebar.write(f"Recalculated {updated} lifts")
 
     if choice == "Home":
         st.subheader("Home")
-        result = session.query(Lift).all()
-        st.write(len(result))
+        st.write(count_lifts(session, user_id))
 
     elif choice == "Add Workout":
         st.subheader("Add Workout")
@@ -58,19 +83,19 @@ def main():
             "Weight (lbs)", min_value=0, max_value=1000, value=0, step=5
         )
         reps = st.number_input("Reps", min_value=0, max_value=99, value=1, step=1)
-        orm = calculate_1RM(weight, reps)
         date = st.date_input("Date")
         if st.button("Add Exercise"):
-            add_data(session, exercise, category, weight, reps, orm, date)
+            add_lift(
+                session, user_id, exercise, category, weight, reps, date, formula
+            )
+            precomputer.schedule(user_id, formula)
             st.write("Added")
 
     elif choice == "View Lifts":
         st.subheader("View Lifts")
         cutoff = st.slider("Weight", min_value=0, max_value=1000, value=500, step=5)
-        df = pd.read_sql(
-            session.query(Lift).filter(Lift.orm > cutoff).statement, session.bind
-        )
-        df["date"] = pd.to_datetime(df["date"])
+        df = get_lifts(session, user_id, formula)
+        df = df[df["orm"] > cutoff]
 
         displayed_lifts = st.multiselect(
             "Lifts to display",
@@ -83,32 +108,22 @@ def main():
     elif choice == "View Progress":
         st.subheader("View Progress")
 
-        df = pd.read_sql(session.query(Lift).statement, session.bind)
-        df["date"] = pd.to_datetime(df["date"])
-        dfw = load_weight_csv(
-            r"C:\Users\andre\Downloads\FitNotes_BodyTracker_Export_2019_12_28_14_11_27.csv"
-        )
-
-        # calculate 1RM maxes for each exercise for each month
-        s = get_maxes(df, "Barbell Squat", "M")
-        b = get_maxes(df, "Flat Barbell Bench Press", "M")
-        d = get_maxes(df, "Deadlift", "M")
-        w = get_maxes(dfw, "Bodyweight", "M")
+        charts = get_charts(session, user_id, formula)
 
         # plot squat/bench/deadlift/weight in Bokeh plot
-        sbd_plot = plot_lift_vs_time(s, b, d, w)
+        sbd_plot = plot_lift_vs_time(*charts["maxes"])
         st.bokeh_chart(sbd_plot)
 
-        # calculate totals for each month and wilks based upon totals
-        total = calculate_total(s, b, d)
-        wilks = pd.DataFrame()
-        wilks["Wilks"] = calculate_wilks(total["Total"], 220, "M", "lb")
-        wilks.name = "Wilks"
-
         # plot total/weight/wilks in Bokeh plot
-        t_plot = plot_lift_vs_time(total, w, wilks)
+        t_plot = plot_lift_vs_time(*charts["totals"])
         st.bokeh_chart(t_plot)
 
+        # plot weekly tonnage for each category in Bokeh plot
+        v_plot = plot_lift_vs_time(
+            *charts["volume"], title="Tonnage vs. Time", y_axis_label="Tonnage (lb)",
+        )
+        st.bokeh_chart(v_plot)
+
 
 if __name__ == "__main__":
     main()
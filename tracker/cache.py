@@ -0,0 +1,85 @@
+"""Cache derived data partitioned by user, so one user's writes only invalidate their own entries"""
+
+import threading
+from collections import OrderedDict
+
+
+class UserCache:
+    """
+    Thread-safe cache of computed values keyed by (user_id, key)
+
+    Every user has their own partition and generation counter. invalidate() only clears the partition
+    of that user, and values computed before an invalidation are discarded instead of being stored.
+    At most 'max_users' partitions are kept, the least recently used one is evicted first.
+    """
+
+    def __init__(self, max_users=64):
+        self._lock = threading.Lock()
+        self._max_users = max_users
+        self._partitions = OrderedDict()
+        self._generations = {}
+        self._epoch = 0
+
+    def generation(self, user_id: int) -> tuple:
+        """
+        Returns a token that changes whenever the user's partition is invalidated
+        """
+        with self._lock:
+            return self._epoch, self._generations.get(user_id, 0)
+
+    def get(self, user_id: int, key, default=None):
+        """
+        Returns cached value for a user, or 'default' if it hasn't been computed
+        """
+        with self._lock:
+            if user_id not in self._partitions:
+                return default
+            self._partitions.move_to_end(user_id)
+            return self._partitions[user_id].get(key, default)
+
+    def set(self, user_id: int, key, value, generation=None):
+        """
+        Stores value for a user, unless the partition was invalidated since 'generation'
+        """
+        with self._lock:
+            if generation is not None and generation != (
+                self._epoch,
+                self._generations.get(user_id, 0),
+            ):
+                return
+            self._partitions.setdefault(user_id, {})[key] = value
+            self._partitions.move_to_end(user_id)
+            while len(self._partitions) > self._max_users:
+                self._partitions.popitem(last=False)
+
+    def get_or_compute(self, user_id: int, key, compute):
+        """
+        Returns cached value for a user, calling compute() and caching the result on a miss
+        """
+        missing = object()
+        value = self.get(user_id, key, missing)
+        if value is missing:
+            generation = self.generation(user_id)
+            value = compute()
+            self.set(user_id, key, value, generation)
+        return value
+
+    def invalidate(self, user_id: int):
+        """
+        Removes all cached values for a user
+        """
+        with self._lock:
+            self._partitions.pop(user_id, None)
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+    def clear(self):
+        """
+        Removes all cached values for every user
+        """
+        with self._lock:
+            self._epoch += 1
+            self._partitions.clear()
+
+
+# shared by every session of the app
+user_cache = UserCache()
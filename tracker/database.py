@@ -1,9 +1,20 @@
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy import Column, Integer, String, Numeric, ForeignKey, Date
+from sqlalchemy import Column, Integer, String, Numeric, Float, ForeignKey, Date, Index
+from sqlalchemy import bindparam, inspect, type_coerce
 from sqlalchemy.orm import relationship
 from sqlalchemy.orm import sessionmaker
+import argparse
 import datetime
+import numpy as np
+
+# https://stackoverflow.com/questions/14132789/relative-imports-for-the-billionth-time
+if __package__:
+    # file being imported as part of the package
+    from tracker.helpers import calculate_1RM  # pylint: disable-msg=E0611
+else:
+    # file is being imported from a script in the same folder
+    from helpers import calculate_1RM  # pylint: disable-msg=E0611
 
 Base = declarative_base()
 
@@ -25,6 +36,10 @@ class Body(Base):
     unit = Column("unit", String(32))
     user_id = Column(Integer, ForeignKey("users.id"))
 
+    __table_args__ = (
+        Index("ix_bodies_user_measurement_date", "user_id", "measurement", "date"),
+    )
+
 
 class Lift(Base):
     __tablename__ = "lifts"
@@ -37,6 +52,11 @@ class Lift(Base):
     date = Column("date", Date)
     user_id = Column(Integer, ForeignKey("users.id"))
 
+    __table_args__ = (
+        Index("ix_lifts_user_exercise_date", "user_id", "exercise", "date"),
+        Index("ix_lifts_user_date", "user_id", "date"),
+    )
+
 
 def start_db(sql_db_file: str):
     # https://ondras.zarovi.cz/sql/demo/
@@ -46,6 +66,15 @@ def start_db(sql_db_file: str):
         connect_args={"check_same_thread": False},
     )
     Base.metadata.create_all(engine)
+
+    # create_all() skips tables that already exist, so add any missing indexes separately
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(engine)
+
     Session = sessionmaker(bind=engine)
     session = Session()
     return engine, session
@@ -59,9 +88,9 @@ def add_data(
     reps: int,
     orm: float,
     date: datetime.date,
-    user_id=None,
+    user_id: int,
 ):
-    """ Add data to database """
+    """ Add lift to database """
     c1 = Lift(
         exercise=exercise,
         category=category,
@@ -74,3 +103,171 @@ def add_data(
 
     session.add(c1)
     session.commit()
+
+
+def add_body(
+    session,
+    measurement: str,
+    value: float,
+    unit: str,
+    date: datetime.date,
+    user_id: int,
+):
+    """ Add body measurement to database """
+    c1 = Body(
+        measurement=measurement, value=value, unit=unit, date=date, user_id=user_id,
+    )
+
+    session.add(c1)
+    session.commit()
+
+
+def bulk_add_lifts(session, df, user_id=None) -> int:
+    """ Add DataFrame of lifts (see load_lifts_csv()) to database in a single executemany insert
+
+    Lifts are added for 'user_id', unless the DataFrame has a user_id column
+    """
+    user_ids = df["user_id"] if "user_id" in df else [user_id] * len(df)
+    records = [
+        {
+            "exercise": exercise,
+            "category": category,
+            "weight": _to_float(weight),
+            "reps": _to_int(reps),
+            "orm": _to_float(orm),
+            "date": date.date(),
+            "user_id": _to_int(lift_user_id),
+        }
+        for date, exercise, category, weight, reps, orm, lift_user_id in zip(
+            df["date"],
+            df["exercise"],
+            df["category"],
+            df["weight"],
+            df["reps"],
+            df["orm"],
+            user_ids,
+        )
+    ]
+    if records:
+        session.execute(Lift.__table__.insert(), records)
+    session.commit()
+    return len(records)
+
+
+def bulk_add_bodies(session, df, user_id=None) -> int:
+    """ Add DataFrame of body measurements (see load_weight_csv()) to database in a single executemany insert
+
+    Measurements are added for 'user_id', unless the DataFrame has a user_id column
+    """
+    user_ids = df["user_id"] if "user_id" in df else [user_id] * len(df)
+    records = [
+        {
+            "measurement": measurement,
+            "value": _to_float(value),
+            "unit": unit,
+            "date": date.date(),
+            "user_id": _to_int(body_user_id),
+        }
+        for date, measurement, value, unit, body_user_id in zip(
+            df["Date"], df["Measurement"], df["Value"], df["Unit"], user_ids
+        )
+    ]
+    if records:
+        session.execute(Body.__table__.insert(), records)
+    session.commit()
+    return len(records)
+
+
+def _to_float(value):
+    # NaN (missing value in a DataFrame) is stored as NULL
+    return None if value is None or value != value else float(value)
+
+
+def _to_int(value):
+    return None if value is None or value != value else int(value)
+
+
+def claim_orphaned_rows(session, user_id: int) -> int:
+    """ Assign lifts and bodies that were added before users existed (user_id NULL) to a user """
+    claimed = 0
+    for table in [Lift.__table__, Body.__table__]:
+        result = session.execute(
+            table.update().where(table.c.user_id.is_(None)).values(user_id=user_id)
+        )
+        claimed += result.rowcount
+    session.commit()
+    return claimed
+
+
+def get_user(session, username: str) -> User:
+    """ Get user from database, adding them if they don't exist yet """
+    user = session.query(User).filter(User.username == username).first()
+    if user is None:
+        user = User(username=username)
+        session.add(user)
+        session.commit()
+    return user
+
+
+def recalculate_orm(session, formula: str, user_id=None, chunk_size=10000) -> int:
+    """ Recalculate stored 1RMs with a different formula, in chunks, within one transaction """
+    query = session.query(
+        Lift.id, type_coerce(Lift.weight, Float), Lift.reps
+    ).order_by(Lift.id)
+    if user_id is not None:
+        query = query.filter(Lift.user_id == user_id)
+
+    update = (
+        Lift.__table__.update()
+        .where(Lift.__table__.c.id == bindparam("lift_id"))
+        .values(orm=bindparam("new_orm"))
+    )
+
+    updated = 0
+    last_id = 0
+    try:
+        while True:
+            # keyset pagination keeps each chunk cheap regardless of table size
+            rows = query.filter(Lift.id > last_id).limit(chunk_size).all()
+            if not rows:
+                break
+
+            ids, weights, reps = zip(*rows)
+            orms = calculate_1RM(
+                np.array(weights, dtype="float64"),
+                np.array(reps, dtype="float64"),
+                formula,
+            )
+            session.execute(
+                update,
+                [
+                    {"lift_id": lift_id, "new_orm": None if np.isnan(orm) else orm}
+                    for lift_id, orm in zip(ids, orms.tolist())
+                ],
+            )
+            updated += len(rows)
+            last_id = ids[-1]
+
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+
+    return updated
+
+
+if __name__ == "__main__":
+
+    # one-time migration: give the history logged before multi-user support to a user
+    # python database.py lift_tracker.db USERNAME
+    parser = argparse.ArgumentParser(
+        description="Assign lifts and bodies without a user to USERNAME"
+    )
+    parser.add_argument("db_file", help="SQLite database file")
+    parser.add_argument("username", help="user to assign the rows to, created if new")
+    args = parser.parse_args()
+
+    engine, session = start_db(args.db_file)
+    user = get_user(session, args.username)
+    claimed = claim_orphaned_rows(session, user.id)
+    print(f"Assigned {claimed} rows to {args.username}")
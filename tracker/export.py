@@ -0,0 +1,254 @@
+"""Stream lifts and bodies from the SQL database to FitNotes-compatible .csv or .parquet files"""
+
+import argparse
+import csv
+import datetime
+from itertools import islice
+from sqlalchemy import Float, type_coerce
+
+# https://stackoverflow.com/questions/14132789/relative-imports-for-the-billionth-time
+if __package__:
+    # file being imported as part of the package
+    from tracker.database import start_db, Lift, Body, User
+else:
+    # file is being run as a script
+    from database import start_db, Lift, Body, User
+
+
+# columns of a FitNotes export, plus the stored 1RM so imports don't have to recalculate it
+# and the username so a whole database export can be restored to the right users
+LIFT_COLUMNS = [
+    "Date",
+    "Exercise",
+    "Category",
+    "Weight (lbs)",
+    "Reps",
+    "Distance",
+    "Distance Unit",
+    "Time",
+    "Comment",
+    "1RM",
+    "User",
+]
+BODY_COLUMNS = ["Date", "Time", "Measurement", "Value", "Unit", "Comment", "User"]
+
+
+def iter_lifts(
+    session, user_id=None, exercise=None, start=None, end=None, chunk_size=10000
+):
+    """
+    Yields lists of at most 'chunk_size' lifts as FitNotes rows, oldest first
+
+    'start' and 'end' are inclusive dates
+    """
+    query = session.query(
+        Lift.date,
+        Lift.exercise,
+        Lift.category,
+        type_coerce(Lift.weight, Float),
+        Lift.reps,
+        type_coerce(Lift.orm, Float),
+        User.username,
+    ).outerjoin(User, Lift.user_id == User.id)
+    if user_id is not None:
+        query = query.filter(Lift.user_id == user_id)
+    if exercise is not None:
+        query = query.filter(Lift.exercise == exercise)
+    query = _filter_dates(query, Lift.date, start, end)
+
+    rows = (
+        [date, exercise, category, weight, reps, None, None, None, None, orm, user]
+        for date, exercise, category, weight, reps, orm, user in query.order_by(
+            Lift.date, Lift.id
+        ).yield_per(chunk_size)
+    )
+    return _chunks(rows, chunk_size)
+
+
+def iter_bodies(
+    session, user_id=None, measurement=None, start=None, end=None, chunk_size=10000
+):
+    """
+    Yields lists of at most 'chunk_size' body measurements as FitNotes rows, oldest first
+
+    'start' and 'end' are inclusive dates
+    """
+    query = session.query(
+        Body.date,
+        Body.measurement,
+        type_coerce(Body.value, Float),
+        Body.unit,
+        User.username,
+    ).outerjoin(User, Body.user_id == User.id)
+    if user_id is not None:
+        query = query.filter(Body.user_id == user_id)
+    if measurement is not None:
+        query = query.filter(Body.measurement == measurement)
+    query = _filter_dates(query, Body.date, start, end)
+
+    rows = (
+        [date, None, measurement, value, unit, None, user]
+        for date, measurement, value, unit, user in query.order_by(
+            Body.date, Body.id
+        ).yield_per(chunk_size)
+    )
+    return _chunks(rows, chunk_size)
+
+
+def _filter_dates(query, column, start, end):
+    if start is not None:
+        query = query.filter(column >= start)
+    if end is not None:
+        # dates can be stored with a time component, so compare against the following day
+        query = query.filter(column < end + datetime.timedelta(days=1))
+    return query
+
+
+def _chunks(rows, chunk_size: int):
+    rows = iter(rows)
+    chunk = list(islice(rows, chunk_size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(rows, chunk_size))
+
+
+def write_csv(chunks, columns: list, csv_file: str) -> int:
+    """
+    Write chunks of rows to a .csv file one chunk at a time
+    """
+    count = 0
+    with open(csv_file, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for chunk in chunks:
+            writer.writerows([[_to_csv(value) for value in row] for row in chunk])
+            count += len(chunk)
+    return count
+
+
+def _to_csv(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime.date):
+        return _to_date(value).isoformat()
+    if isinstance(value, float):
+        # repr() round-trips floats exactly when read back with float_precision="round_trip"
+        return repr(value)
+    return value
+
+
+def write_parquet(chunks, columns: list, parquet_file: str) -> int:
+    """
+    Write chunks of rows to a .parquet file, one row group per chunk
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("pyarrow is required to export to .parquet")
+
+    types = {
+        "Date": pa.date32(),
+        "Weight (lbs)": pa.float64(),
+        "Reps": pa.int64(),
+        "Value": pa.float64(),
+        "1RM": pa.float64(),
+    }
+    schema = pa.schema([(column, types.get(column, pa.string())) for column in columns])
+
+    count = 0
+    with pq.ParquetWriter(parquet_file, schema) as writer:
+        for chunk in chunks:
+            arrays = [
+                [_to_date(value) if i == 0 else value for value in values]
+                for i, values in enumerate(zip(*chunk))
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            count += len(chunk)
+    return count
+
+
+def _to_date(value):
+    # SQLite can return datetimes for date columns that were stored with a time component
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    return value
+
+
+def export_lifts(
+    session,
+    output_file: str,
+    file_format="csv",
+    user_id=None,
+    exercise=None,
+    start=None,
+    end=None,
+    chunk_size=10000,
+) -> int:
+    """
+    Export lifts to a .csv or .parquet file with bounded memory, returns number of lifts exported
+    """
+    chunks = iter_lifts(session, user_id, exercise, start, end, chunk_size)
+    return _write(chunks, LIFT_COLUMNS, output_file, file_format)
+
+
+def export_bodies(
+    session,
+    output_file: str,
+    file_format="csv",
+    user_id=None,
+    measurement=None,
+    start=None,
+    end=None,
+    chunk_size=10000,
+) -> int:
+    """
+    Export body measurements to a .csv or .parquet file with bounded memory, returns number of rows exported
+    """
+    chunks = iter_bodies(session, user_id, measurement, start, end, chunk_size)
+    return _write(chunks, BODY_COLUMNS, output_file, file_format)
+
+
+def _write(chunks, columns: list, output_file: str, file_format: str) -> int:
+    if file_format == "csv":
+        return write_csv(chunks, columns, output_file)
+    if file_format == "parquet":
+        return write_parquet(chunks, columns, output_file)
+    raise ValueError(f"Unknown export format: {file_format}")
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("db_file", help="SQLite database file")
+    parser.add_argument("output_file", help=".csv or .parquet file to write")
+    parser.add_argument("--table", choices=["lifts", "bodies"], default="lifts")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--user", help="username to export, defaults to all users")
+    parser.add_argument("--exercise", help="exercise (lifts) or measurement (bodies)")
+    parser.add_argument("--start", type=datetime.date.fromisoformat)
+    parser.add_argument("--end", type=datetime.date.fromisoformat)
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    engine, session = start_db(args.db_file)
+
+    user_id = None
+    if args.user is not None:
+        user = session.query(User).filter(User.username == args.user).first()
+        if user is None:
+            parser.error(f"Unknown user: {args.user}")
+        user_id = user.id
+
+    export = export_lifts if args.table == "lifts" else export_bodies
+    count = export(
+        session,
+        args.output_file,
+        args.format,
+        user_id,
+        args.exercise,
+        args.start,
+        args.end,
+        args.chunk_size,
+    )
+    print(f"Exported {count} {args.table} to {args.output_file}")
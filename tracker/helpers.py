@@ -8,11 +8,43 @@ from bokeh.plotting import figure, output_file, show
 from bokeh.palettes import Category10  # pylint: disable-msg=E0611
 
 
-def calculate_1RM(weight: float, reps: int) -> float:
+def _default_1RM(weight, reps):
+    return weight * 1.03 ** (reps - 1)
+
+
+def _epley_1RM(weight, reps):
+    return weight * (1 + reps / 30)
+
+
+def _brzycki_1RM(weight, reps):
+    # only valid for fewer than 37 reps, NaN otherwise
+    valid_reps = np.where(np.less(reps, 37), reps, np.nan)
+    return weight * 36 / (37 - valid_reps)
+
+
+def _lombardi_1RM(weight, reps):
+    return weight * reps ** 0.10
+
+
+# https://en.wikipedia.org/wiki/One-repetition_maximum
+ONE_RM_FORMULAS = {
+    "default": _default_1RM,
+    "epley": _epley_1RM,
+    "brzycki": _brzycki_1RM,
+    "lombardi": _lombardi_1RM,
+}
+
+
+def calculate_1RM(weight: float, reps: int, formula="default") -> float:
     """
     Calculate one repetition maximum
+
+    'weight' 'reps' can be scalars or arrays/Series, 'formula' is a key of ONE_RM_FORMULAS
     """
-    return weight * 1.03 ** (reps - 1)
+    if formula not in ONE_RM_FORMULAS:
+        raise ValueError(f"Unknown 1RM formula: {formula}")
+
+    return ONE_RM_FORMULAS[formula](weight, reps)
 
 
 def calculate_wilks(t: float, bw: float, sex: str, units: str) -> float:
@@ -60,13 +92,24 @@ def calculate_total(s: pd.DataFrame, b: pd.DataFrame, d: pd.DataFrame) -> pd.Dat
     return total
 
 
-def load_lifts_csv(csv_file: str) -> pd.DataFrame:
+def load_lifts_csv(csv_file: str, formula="default") -> pd.DataFrame:
     """
     Load lifts .csv file to a DataFrame
     """
     # fields: date, exercise, category, weight, reps
-    df = pd.read_csv(csv_file)
+    df = pd.read_csv(csv_file, dtype={"User": str}, float_precision="round_trip")
+    return _clean_lifts(df, formula)
+
 
+def load_lifts_parquet(parquet_file: str, formula="default") -> pd.DataFrame:
+    """
+    Load lifts .parquet file with the same columns as a FitNotes .csv export to a DataFrame
+    """
+    df = pd.read_parquet(parquet_file)
+    return _clean_lifts(df, formula)
+
+
+def _clean_lifts(df: pd.DataFrame, formula: str) -> pd.DataFrame:
     # drop useless columns, change column types, etc.
     df = df.drop("Distance", 1)
     df = df.drop("Distance Unit", 1)
@@ -75,8 +118,9 @@ def load_lifts_csv(csv_file: str) -> pd.DataFrame:
     # df["Comment"] = df["Comment"].astype("object")
     df = df.drop("Comment", 1)
 
-    # create 1RM column
-    df["1RM"] = df["Weight (lbs)"] * 1.03 ** (df["Reps"] - 1)
+    # create 1RM column, unless it was already exported with the lifts
+    if "1RM" not in df:
+        df["1RM"] = calculate_1RM(df["Weight (lbs)"], df["Reps"], formula)
 
     df = df.rename(
         columns={
@@ -93,13 +137,19 @@ def load_lifts_csv(csv_file: str) -> pd.DataFrame:
     return df
 
 
-def load_lifts_sql(sql_db_file: str):
+def load_lifts_sql(sql_db_file: str, formula=None):
     """
     Loads lifts from SQL database to a DataFrame
+
+    If 'formula' is given, the 1RM column is recalculated on read instead of using the stored values
     """
     engine = create_engine(f"sqlite:///{sql_db_file}", echo=False)
 
     df = pd.read_sql_table("lifts", engine)
+    if formula is not None:
+        df["orm"] = calculate_1RM(
+            df["weight"].astype("float64"), df["reps"], formula
+        )
     return df
 
 
@@ -182,7 +232,9 @@ def remove_exercise(df: pd.DataFrame, removed_exercise):
     return None
 
 
-def plot_lift_vs_time(*args: pd.DataFrame):
+def plot_lift_vs_time(
+    *args: pd.DataFrame, title="One Rep Maxes vs. Time", y_axis_label="Max 1RM (lb)"
+):
     """
     Plot an arbitrary number of lifts on an HTML line chart
     """
@@ -192,9 +244,9 @@ def plot_lift_vs_time(*args: pd.DataFrame):
     # create a new plot with a title and axis labels
     # https://bokeh.pydata.org/en/latest/docs/reference/models/layouts.html#bokeh.models.layouts.LayoutDOM.sizing_mode
     p = figure(
-        title="One Rep Maxes vs. Time",
+        title=title,
         x_axis_label="Time",
-        y_axis_label="Max 1RM (lb)",
+        y_axis_label=y_axis_label,
         x_axis_type="datetime",
         sizing_mode="stretch_width",
         plot_height=400,
@@ -0,0 +1,310 @@
+"""Simulate concurrent app sessions against one SQLite file and report throughput, latency, and lock errors"""
+
+import argparse
+import datetime
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from sqlalchemy.exc import OperationalError
+
+# https://stackoverflow.com/questions/14132789/relative-imports-for-the-billionth-time
+if __package__:
+    # file being imported as part of the package
+    from tracker.helpers import (  # pylint: disable-msg=E0611
+        calculate_1RM,
+        plot_lift_vs_time,
+    )
+    from tracker.database import (
+        start_db,
+        bulk_add_lifts,
+        bulk_add_bodies,
+        get_user,
+        User,
+    )
+    from tracker.cache import user_cache
+    from tracker.precompute import Precomputer
+    from tracker.queries import (
+        count_lifts,
+        get_lifts,
+        get_charts,
+        add_lift,
+    )
+else:
+    # file is being run as a script
+    from helpers import calculate_1RM, plot_lift_vs_time  # pylint: disable-msg=E0611
+    from database import (
+        start_db,
+        bulk_add_lifts,
+        bulk_add_bodies,
+        get_user,
+        User,
+    )
+    from cache import user_cache
+    from precompute import Precomputer
+    from queries import (
+        count_lifts,
+        get_lifts,
+        get_charts,
+        add_lift,
+    )
+
+
+EXERCISES = {
+    "Barbell Squat": "Legs",
+    "Flat Barbell Bench Press": "Chest",
+    "Deadlift": "Back",
+    "Seated Barbell Press": "Shoulders",
+    "Barbell Curl": "Biceps",
+    "Hanging Leg Raise": "Abs",
+}
+
+
+def generate_db(db_file: str, users=20, lifts_per_user=5000, seed=0):
+    """
+    Create a database with random lifts and bodyweights for a number of users
+    """
+    rng = np.random.default_rng(seed)
+    engine, session = start_db(db_file)
+    exercises = np.array(list(EXERCISES))
+    categories = np.array(list(EXERCISES.values()))
+
+    for i in range(users):
+        user_id = get_user(session, f"lifter{i}").id
+
+        # roughly 4 years of training history, several sets per day
+        days = rng.integers(0, 4 * 365, lifts_per_user)
+        picks = rng.integers(0, len(exercises), lifts_per_user)
+        weights = rng.integers(9, 100, lifts_per_user) * 5.0
+        reps = rng.integers(1, 13, lifts_per_user)
+        lifts = pd.DataFrame(
+            {
+                "date": pd.Timestamp("2017-01-01") + pd.to_timedelta(days, "D"),
+                "exercise": exercises[picks],
+                "category": categories[picks],
+                "weight": weights,
+                "reps": reps,
+                "orm": calculate_1RM(weights, reps),
+            }
+        )
+        bulk_add_lifts(session, lifts, user_id)
+
+        bodies = pd.DataFrame(
+            {
+                "Date": pd.date_range("2017-01-01", periods=4 * 52, freq="W"),
+                "Measurement": "Bodyweight",
+                "Value": rng.normal(200, 10, 4 * 52).round(1),
+                "Unit": "lbs",
+            }
+        )
+        bulk_add_bodies(session, bodies, user_id)
+
+    session.close()
+    engine.dispose()
+
+
+def home(session, user_id: int, rng: random.Random):
+    """
+    Same data-layer calls as the "Home" view of app.py
+    """
+    count_lifts(session, user_id)
+
+
+def add_workout(session, user_id: int, rng: random.Random):
+    """
+    Same data-layer calls as the "Add Workout" view of app.py
+    """
+    exercise = rng.choice(list(EXERCISES))
+    add_lift(
+        session,
+        user_id,
+        exercise,
+        EXERCISES[exercise],
+        rng.randrange(45, 500, 5),
+        rng.randint(1, 12),
+        datetime.date.today(),
+    )
+
+
+def view_lifts(session, user_id: int, rng: random.Random):
+    """
+    Same data-layer calls as the "View Lifts" view of app.py
+    """
+    df = get_lifts(session, user_id, "default")
+    df = df[df["orm"] > rng.randrange(0, 1000, 5)]
+    df["exercise"].unique().tolist()
+
+
+def view_progress(session, user_id: int, rng: random.Random):
+    """
+    Same data-layer calls as the "View Progress" view of app.py
+    """
+    charts = get_charts(session, user_id, "default")
+    plot_lift_vs_time(*charts["maxes"])
+    plot_lift_vs_time(*charts["totals"])
+    plot_lift_vs_time(
+        *charts["volume"], title="Tonnage vs. Time", y_axis_label="Tonnage (lb)",
+    )
+
+
+READ_PAGES = [home, view_lifts, view_progress]
+
+
+def run_session(
+    db_file: str,
+    username: str,
+    operations: int,
+    write_ratio: float,
+    cold: bool,
+    seed: int,
+    precomputer=None,
+) -> list:
+    """
+    Simulate one lifter clicking through the app, returns (page, seconds, error) for each page load
+    """
+    rng = random.Random(seed)
+    results = []
+
+    for _ in range(operations):
+        page = add_workout if rng.random() < write_ratio else rng.choice(READ_PAGES)
+
+        error = None
+        engine = session = None
+        start = time.perf_counter()
+        try:
+            # app.py opens the database and looks up the user on every page load
+            engine, session = start_db(db_file)
+            user_id = get_user(session, username).id
+            if cold:
+                user_cache.invalidate(user_id)
+
+            page(session, user_id, rng)
+            if page is add_workout and precomputer is not None:
+                precomputer.schedule(user_id)
+        except OperationalError as e:
+            if session is not None:
+                session.rollback()
+            error = "locked" if "locked" in str(e) else "operational"
+        results.append((page.__name__, time.perf_counter() - start, error))
+
+        if session is not None:
+            session.close()
+        if engine is not None:
+            engine.dispose()
+
+    return results
+
+
+def run_load_test(
+    db_file: str,
+    sessions=20,
+    operations=100,
+    write_ratio=0.1,
+    cold=False,
+    seed=0,
+    precompute=False,
+) -> tuple:
+    """
+    Run concurrent sessions against a database
+
+    Returns a DataFrame with one row per page load and the total number of seconds the sessions took
+    """
+    # the cache is module-level, start every run cold so runs are comparable
+    user_cache.clear()
+
+    engine, session = start_db(db_file)
+    usernames = [username for (username,) in session.query(User.username)]
+    session.close()
+    if not usernames:
+        raise ValueError(
+            f"{db_file} has no users, generate a new database or assign its rows to a "
+            "user with database.py"
+        )
+    precomputer = Precomputer(engine) if precompute else None
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as executor:
+        futures = [
+            executor.submit(
+                run_session,
+                db_file,
+                usernames[i % len(usernames)],
+                operations,
+                write_ratio,
+                cold,
+                seed + i,
+                precomputer,
+            )
+            for i in range(sessions)
+        ]
+        results = [result for future in futures for result in future.result()]
+    elapsed = time.perf_counter() - start
+    if precomputer is not None:
+        precomputer.shutdown()
+    engine.dispose()
+
+    df = pd.DataFrame(results, columns=["page", "seconds", "error"])
+    return df, elapsed
+
+
+def summarize(df: pd.DataFrame, elapsed: float) -> pd.DataFrame:
+    """
+    Summarize page loads from run_load_test() with throughput, latency percentiles (ms), and error counts
+    """
+    rows = []
+    for page, group in [("all", df)] + list(df.groupby("page")):
+        ms = group["seconds"].to_numpy() * 1000
+        rows.append(
+            {
+                "page": page,
+                "count": len(group),
+                "per_second": len(group) / elapsed,
+                "p50": np.percentile(ms, 50),
+                "p95": np.percentile(ms, 95),
+                "p99": np.percentile(ms, 99),
+                "lock_errors": (group["error"] == "locked").sum(),
+                "other_errors": (group["error"] == "operational").sum(),
+            }
+        )
+    return pd.DataFrame(rows).set_index("page")
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("db_file", help="SQLite database file, generated if missing")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--lifts-per-user", type=int, default=5000)
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--operations", type=int, default=100)
+    parser.add_argument("--write-ratio", type=float, default=0.1)
+    parser.add_argument(
+        "--cold", action="store_true", help="invalidate caches before every page load"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--precompute",
+        action="store_true",
+        help="warm caches in the background after writes",
+    )
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db_file):
+        generate_db(args.db_file, args.users, args.lifts_per_user, args.seed)
+
+    try:
+        df, elapsed = run_load_test(
+            args.db_file,
+            args.sessions,
+            args.operations,
+            args.write_ratio,
+            args.cold,
+            args.seed,
+            args.precompute,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"{len(df)} page loads in {elapsed:.1f} s")
+    print(summarize(df, elapsed).round(1).to_string())
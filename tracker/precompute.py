@@ -0,0 +1,100 @@
+"""Warm a user's cached maxes, totals, wilks, and chart data in the background after they write"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy.orm import sessionmaker
+
+# https://stackoverflow.com/questions/14132789/relative-imports-for-the-billionth-time
+if __package__:
+    # file being imported as part of the package
+    from tracker.queries import count_lifts, get_lifts, get_charts
+else:
+    # file is being imported from a script in the same folder
+    from queries import count_lifts, get_lifts, get_charts
+
+logger = logging.getLogger(__name__)
+
+
+def warm_user(session, user_id: int, formula="default"):
+    """
+    Compute and cache everything the app's views need for a user
+    """
+    count_lifts(session, user_id)
+    get_lifts(session, user_id, formula)
+    get_charts(session, user_id, formula)
+
+
+class Precomputer:
+    """
+    Warms users' cached data on background threads after writes
+
+    Writes for a user within 'delay' seconds of each other, or while their warm-up is still queued,
+    are coalesced into a single recomputation. schedule() never blocks the caller.
+    """
+
+    def __init__(self, engine, delay=0.5, max_workers=2):
+        self._Session = sessionmaker(bind=engine)
+        self._delay = delay
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._timers = set()
+
+    def schedule(self, user_id: int, formula="default"):
+        """
+        Queue a warm-up of a user's cached data, call after each committed write
+        """
+        with self._lock:
+            already_queued = user_id in self._pending
+            self._pending[user_id] = formula
+            if already_queued:
+                return
+
+            # wait for a burst of writes to finish without holding a worker thread
+            timer = threading.Timer(self._delay, self._submit, args=(user_id,))
+            timer.daemon = True
+            self._timers.add(timer)
+        timer.start()
+
+    def _submit(self, user_id: int):
+        try:
+            future = self._executor.submit(self._warm, user_id)
+            future.add_done_callback(self._log_failure)
+        except RuntimeError:
+            # shutdown(wait=False) was called while this warm-up was waiting
+            pass
+        finally:
+            # only forget the timer once its warm-up is queued, so shutdown() can't miss it
+            with self._lock:
+                self._timers.discard(threading.current_thread())
+
+    def _warm(self, user_id: int):
+        with self._lock:
+            formula = self._pending.pop(user_id)
+
+        # writes from here on queue another warm-up, and UserCache discards anything computed
+        # from data they made stale, so a failure here only means the next page load is cold
+        session = self._Session()
+        try:
+            warm_user(session, user_id, formula)
+        finally:
+            session.close()
+
+    @staticmethod
+    def _log_failure(future):
+        if future.exception() is not None:
+            logger.error("Warming cached data failed", exc_info=future.exception())
+
+    def shutdown(self, wait=True):
+        """
+        Stop accepting warm-ups, optionally waiting for queued ones to finish
+        """
+        with self._lock:
+            timers = list(self._timers)
+        for timer in timers:
+            if wait:
+                timer.join()
+            else:
+                timer.cancel()
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,287 @@
+"""User-scoped reads and writes of lifts/bodies, with results cached per user"""
+
+import datetime
+import pandas as pd
+from sqlalchemy import func
+
+# https://stackoverflow.com/questions/14132789/relative-imports-for-the-billionth-time
+if __package__:
+    # file being imported as part of the package
+    from tracker.helpers import (  # pylint: disable-msg=E0611
+        calculate_1RM,
+        load_lifts_csv,
+        load_lifts_parquet,
+        get_maxes,
+        calculate_total,
+        calculate_wilks,
+    )
+    from tracker.analytics import get_volume, get_volume_series
+    from tracker.database import (
+        add_data,
+        add_body,
+        bulk_add_lifts,
+        bulk_add_bodies,
+        recalculate_orm,
+        get_user,
+        Lift,
+        Body,
+    )
+    from tracker.cache import user_cache
+else:
+    # file is being imported from a script in the same folder
+    from helpers import (  # pylint: disable-msg=E0611
+        calculate_1RM,
+        load_lifts_csv,
+        load_lifts_parquet,
+        get_maxes,
+        calculate_total,
+        calculate_wilks,
+    )
+    from analytics import get_volume, get_volume_series
+    from database import (
+        add_data,
+        add_body,
+        bulk_add_lifts,
+        bulk_add_bodies,
+        recalculate_orm,
+        get_user,
+        Lift,
+        Body,
+    )
+    from cache import user_cache
+
+
+def count_lifts(session, user_id: int) -> int:
+    """
+    Returns number of lifts logged by a user
+    """
+
+    def compute():
+        return (
+            session.query(func.count(Lift.id)).filter(Lift.user_id == user_id).scalar()
+        )
+
+    return user_cache.get_or_compute(user_id, ("count",), compute)
+
+
+def get_lifts(session, user_id: int, formula=None) -> pd.DataFrame:
+    """
+    Loads a user's lifts to a DataFrame
+
+    If 'formula' is given, the 1RM column is recalculated on read instead of using the stored values
+    """
+
+    def compute():
+        df = pd.read_sql(
+            session.query(Lift).filter(Lift.user_id == user_id).statement,
+            session.bind,
+        )
+        df["date"] = pd.to_datetime(df["date"])
+        df["weight"] = df["weight"].astype("float64")
+        df["orm"] = df["orm"].astype("float64")
+        if formula is not None:
+            df["orm"] = calculate_1RM(df["weight"], df["reps"], formula)
+        return df
+
+    return user_cache.get_or_compute(user_id, ("lifts", formula), compute)
+
+
+def get_bodies(session, user_id: int, measurement="Bodyweight") -> pd.DataFrame:
+    """
+    Loads a user's body measurements to a DataFrame with the same columns as load_weight_csv()
+    """
+
+    def compute():
+        df = pd.read_sql(
+            session.query(Body.date, Body.measurement, Body.value, Body.unit)
+            .filter(Body.user_id == user_id, Body.measurement == measurement)
+            .statement,
+            session.bind,
+        )
+        df = df.rename(
+            columns={
+                "date": "Date",
+                "measurement": "Measurement",
+                "value": "Value",
+                "unit": "Unit",
+            }
+        )
+        df["Date"] = pd.to_datetime(df["Date"])
+        df["Value"] = df["Value"].astype("float64")
+        return df
+
+    return user_cache.get_or_compute(user_id, ("bodies", measurement), compute)
+
+
+def get_progress(
+    session, user_id: int, formula=None, frequency="M", bodyweight=220
+) -> dict:
+    """
+    Get a user's squat/bench/deadlift/bodyweight maxes, totals, and wilks within a specific time interval
+    """
+
+    def compute():
+        df = get_lifts(session, user_id, formula)
+        dfw = get_bodies(session, user_id)
+
+        # calculate 1RM maxes for each exercise for each interval
+        s = get_maxes(df, "Barbell Squat", frequency)
+        b = get_maxes(df, "Flat Barbell Bench Press", frequency)
+        d = get_maxes(df, "Deadlift", frequency)
+        w = get_maxes(dfw, "Bodyweight", frequency)
+
+        # calculate totals for each interval and wilks based upon totals
+        total = calculate_total(s, b, d)
+        wilks = pd.DataFrame()
+        wilks["Wilks"] = calculate_wilks(total["Total"], bodyweight, "M", "lb")
+        wilks.name = "Wilks"
+
+        return {
+            "squat": s,
+            "bench": b,
+            "deadlift": d,
+            "bodyweight": w,
+            "total": total,
+            "wilks": wilks,
+        }
+
+    return user_cache.get_or_compute(
+        user_id, ("progress", formula, frequency, bodyweight), compute
+    )
+
+
+def get_user_volume(
+    session, user_id: int, formula=None, frequency="W", by="category"
+) -> pd.DataFrame:
+    """
+    Get a user's training volume within a specific time interval, see get_volume()
+    """
+
+    def compute():
+        return get_volume(get_lifts(session, user_id, formula), frequency, by)
+
+    return user_cache.get_or_compute(
+        user_id, ("volume", formula, frequency, by), compute
+    )
+
+
+def get_charts(session, user_id: int, formula=None) -> dict:
+    """
+    Get the DataFrames plotted on the "View Progress" page, one list per chart
+    """
+
+    def compute():
+        progress = get_progress(session, user_id, formula, "M")
+        volume = get_user_volume(session, user_id, formula, "W", "category")
+        return {
+            "maxes": [
+                progress["squat"],
+                progress["bench"],
+                progress["deadlift"],
+                progress["bodyweight"],
+            ],
+            "totals": [progress["total"], progress["bodyweight"], progress["wilks"]],
+            "volume": [
+                get_volume_series(volume, "Legs"),
+                get_volume_series(volume, "Back"),
+                get_volume_series(volume, "Chest"),
+            ],
+        }
+
+    return user_cache.get_or_compute(user_id, ("charts", formula), compute)
+
+
+def add_lift(
+    session,
+    user_id: int,
+    exercise: str,
+    category: str,
+    weight: float,
+    reps: int,
+    date: datetime.date,
+    formula="default",
+):
+    """
+    Add lift for a user to the database and invalidate their cached data
+    """
+    orm = calculate_1RM(weight, reps, formula)
+    add_data(session, exercise, category, weight, reps, orm, date, user_id)
+    user_cache.invalidate(user_id)
+
+
+def add_measurement(
+    session,
+    user_id: int,
+    measurement: str,
+    value: float,
+    unit: str,
+    date: datetime.date,
+):
+    """
+    Add body measurement for a user to the database and invalidate their cached data
+    """
+    add_body(session, measurement, value, unit, date, user_id)
+    user_cache.invalidate(user_id)
+
+
+def recalculate_user_orm(session, user_id: int, formula: str) -> int:
+    """
+    Recalculate a user's stored 1RMs with a different formula and invalidate their cached data
+    """
+    updated = recalculate_orm(session, formula, user_id)
+    user_cache.invalidate(user_id)
+    return updated
+
+
+def import_lifts(session, user_id, lifts_file: str, formula="default") -> int:
+    """
+    Bulk import lifts from a FitNotes .csv or .parquet export and invalidate the cached data of their users
+
+    Lifts exported with a username (see export.py) go back to that user, the rest go to 'user_id'
+    """
+    if lifts_file.endswith(".parquet"):
+        df = load_lifts_parquet(lifts_file, formula)
+    else:
+        df = load_lifts_csv(lifts_file, formula)
+
+    df = _assign_users(session, df, user_id)
+    added = bulk_add_lifts(session, df)
+    _invalidate_users(df)
+    return added
+
+
+def import_bodies(session, user_id, bodies_file: str) -> int:
+    """
+    Bulk import body measurements from a FitNotes .csv or .parquet export and invalidate the cached data of their users
+
+    Measurements exported with a username (see export.py) go back to that user, the rest go to 'user_id'
+    """
+    if bodies_file.endswith(".parquet"):
+        df = pd.read_parquet(bodies_file)
+    else:
+        df = pd.read_csv(
+            bodies_file, dtype={"User": str}, float_precision="round_trip"
+        )
+    df["Date"] = pd.to_datetime(df["Date"])
+
+    df = _assign_users(session, df, user_id)
+    added = bulk_add_bodies(session, df)
+    _invalidate_users(df)
+    return added
+
+
+def _assign_users(session, df: pd.DataFrame, user_id) -> pd.DataFrame:
+    if "User" in df:
+        usernames = df["User"].dropna().unique()
+        user_ids = {username: get_user(session, username).id for username in usernames}
+        df["user_id"] = df["User"].map(user_ids)
+    else:
+        df["user_id"] = None
+    if user_id is not None:
+        df["user_id"] = df["user_id"].fillna(user_id)
+    return df
+
+
+def _invalidate_users(df: pd.DataFrame):
+    for user_id in df["user_id"].dropna().unique():
+        user_cache.invalidate(int(user_id))
@@ -0,0 +1,47 @@
+"""Bulk import lifts and bodies from .csv or .parquet files written by export.py (or FitNotes)"""
+
+import argparse
+
+# https://stackoverflow.com/questions/14132789/relative-imports-for-the-billionth-time
+if __package__:
+    # file being imported as part of the package
+    from tracker.helpers import ONE_RM_FORMULAS  # pylint: disable-msg=E0611
+    from tracker.database import start_db, get_user
+    from tracker.queries import import_lifts, import_bodies
+else:
+    # file is being run as a script
+    from helpers import ONE_RM_FORMULAS  # pylint: disable-msg=E0611
+    from database import start_db, get_user
+    from queries import import_lifts, import_bodies
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("db_file", help="SQLite database file")
+    parser.add_argument("input_file", help=".csv or .parquet file to read")
+    parser.add_argument("--table", choices=["lifts", "bodies"], default="lifts")
+    parser.add_argument(
+        "--user",
+        help="username for rows without one, created if new; rows exported with a "
+        "username always go back to that user",
+    )
+    parser.add_argument(
+        "--formula",
+        choices=list(ONE_RM_FORMULAS),
+        default="default",
+        help="1RM formula for lifts exported without a 1RM column",
+    )
+    args = parser.parse_args()
+
+    engine, session = start_db(args.db_file)
+
+    user_id = None
+    if args.user is not None:
+        user_id = get_user(session, args.user).id
+
+    if args.table == "lifts":
+        count = import_lifts(session, user_id, args.input_file, args.formula)
+    else:
+        count = import_bodies(session, user_id, args.input_file)
+    print(f"Imported {count} {args.table} from {args.input_file}")